@@ -6,17 +6,25 @@ data/ と financedata/ のCSVファイルを読み込み、
 ダッシュボード用の統合JSONファイル (stock_data.json) を生成する。
 """
 
+import bisect
 import csv
 import json
+import math
+import multiprocessing
 import os
-import glob
-from collections import OrderedDict
+from operator import itemgetter
+
+try:
+    import orjson
+except ImportError:  # orjson がない環境では標準ライブラリの json で出力する
+    orjson = None
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 FINANCE_DIR = os.path.join(BASE_DIR, 'financedata')
 OUTPUT_FILE = os.path.join(BASE_DIR, 'stock_data.json')
 CHARTLIST_FILE = os.path.join(BASE_DIR, 'allchartlist.csv')
+CACHE_DIR = os.path.join(BASE_DIR, '.cache')
 
 # financedataの全数値フィールド
 FINANCE_NUM_FIELDS = [
@@ -31,6 +39,20 @@ FINANCE_NUM_FIELDS = [
 # financedataの文字列フィールド
 FINANCE_STR_FIELDS = ['CurFYEn', 'DiscDate', 'NxtFYEn']
 
+# 読み込む列（CSVのそれ以外の列は保持しない）
+FINANCE_COLUMNS = FINANCE_STR_FIELDS + FINANCE_NUM_FIELDS
+PRICE_COLUMNS = ['Date', 'Close']
+
+# 出力JSONの各銘柄のキー（process_stock はこの順に値を並べたタプルを返す）
+RESULT_KEYS = (
+    ['code', 'name', 'price']
+    + FINANCE_STR_FIELDS
+    + FINANCE_NUM_FIELDS
+    + ['per', 'pbr', 'roe', 'pcfr', 'DivYield', 'FDivYield', 'roa',
+       'MarketCap', 'fper', 'psr', 'ev_ebitda', 'CFTotal',
+       'ph', 'fh']
+)
+
 
 def load_chartlist():
     """allchartlist.csv からコード→銘柄名のマッピングを読み込む。"""
@@ -49,59 +71,93 @@ def load_chartlist():
     return mapping
 
 
-def read_csv(filepath):
-    rows = []
-    with open(filepath, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            rows.append(row)
-    return rows
+def read_csv(filepath, usecols):
+    """CSVを読み込み、usecols の各列を 列名→セル値のリスト で返す。
 
+    行ごとに dict を作る csv.DictReader は使わず、csv.reader の行から
+    必要な列だけを列単位で取り出す（列番号はファイルごとに一度だけ引く）。
+    """
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        rows = [row for row in reader if row]
+    index = {name: i for i, name in enumerate(header)}
+    return {name: get_column(rows, index.get(name)) for name in usecols}
 
-def to_float(val):
-    if val is None:
-        return None
-    val = str(val).strip()
-    if val == '':
-        return None
+
+def get_column(rows, i):
+    """全行から列番号 i のセル値をリストで取り出す。
+
+    各行へは itemgetter で直接アクセスする。列がない (i が None) 場合や
+    行が短い場合は空文字列とする。
+    """
+    if i is None:
+        return [''] * len(rows)
     try:
-        return float(val)
-    except (ValueError, TypeError):
-        return None
+        return list(map(itemgetter(i), rows))
+    except IndexError:
+        return [row[i] if i < len(row) else '' for row in rows]
 
 
-def to_int(val):
-    if val is None:
-        return None
-    val = str(val).strip()
-    if val == '':
+def dumps_json(obj):
+    """obj を区切り空白なし・非ASCIIそのままの JSON (UTF-8 の bytes) に変換する。
+
+    orjson があれば使い、なければ標準ライブラリの json で同じ形式に出力する。
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def write_json(obj, filepath):
+    """obj を dumps_json の形式で filepath に書き出す。"""
+    with open(filepath, 'wb') as f:
+        f.write(dumps_json(obj))
+
+
+def read_json(filepath):
+    """write_json で書き出した JSON を読み込む。"""
+    if orjson is not None:
+        with open(filepath, 'rb') as f:
+            return orjson.loads(f.read())
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def to_float(val):
+    """CSVのセル値（文字列）を float に変換する。空欄や数値でない値は None を返す。
+
+    呼び出し元は常に csv.reader の文字列を渡すため、文字列専用の処理にしている。
+    float() は前後の空白を自前で無視するため、strip() は行わない。
+    nan / inf は JSON で表せない（出力方法によって null と NaN に分かれる）ため
+    None として扱う。
+    """
+    if not val:
         return None
     try:
-        return int(val)
-    except (ValueError, TypeError):
+        v = float(val)
+    except ValueError:
         return None
+    if not math.isfinite(v):
+        return None
+    return v
 
 
-def get_quarterly_prices(price_rows):
-    """日次株価データから四半期末（3月末区切り）の終値を抽出する。"""
-    monthly = OrderedDict()
-    for row in price_rows:
-        date_str = row.get('Date', '').strip()
-        close = to_float(row.get('Close'))
-        if not date_str or close is None:
-            continue
-        ym = date_str[:7]
-        monthly[ym] = close
+def get_quarterly_prices(price_pairs):
+    """日次株価データから四半期末（3月末区切り）の終値を抽出する。
+
+    price_pairs は日付順に並んだ (日付, 終値) のリスト。同じ年月は後の値で
+    上書きされるため、各月の最後の終値が月順に並ぶ。
+    """
+    monthly = {d[:7]: c for d, c in price_pairs}
     return list(monthly.items())
 
 
 def find_price_on_date(price_by_date, sorted_dates, target_date):
     """指定日付またはその直前の取引日の終値を取得する。"""
-    if target_date in price_by_date:
-        return price_by_date[target_date]
-    for d in reversed(sorted_dates):
-        if d <= target_date:
-            return price_by_date[d]
+    i = bisect.bisect_right(sorted_dates, target_date)
+    if i:
+        return price_by_date[sorted_dates[i - 1]]
     return None
 
 
@@ -111,165 +167,181 @@ def find_price_on_or_after_date(price_by_date, sorted_dates, target_date):
     決算発表は通常引け後に行われるため、発表当日の株価がある場合は
     その終値を、ない場合は翌営業日の終値を返す。
     """
-    if target_date in price_by_date:
-        return price_by_date[target_date]
-    for d in sorted_dates:
-        if d >= target_date:
-            return price_by_date[d]
+    i = bisect.bisect_left(sorted_dates, target_date)
+    if i < len(sorted_dates):
+        return price_by_date[sorted_dates[i]]
     return None
 
 
 def process_stock(code, finance_path, price_path, name):
-    """1銘柄のデータを処理し、統合データを返す。"""
+    """1銘柄のデータを処理し、統合データを RESULT_KEYS の順のタプルで返す。
+
+    キー名は出力時にまとめて付けるため、銘柄ごとに dict を作らない
+    （プロセス間の受け渡しやキャッシュにもキー名を含めずに済む）。
+    """
     try:
-        finance_rows = read_csv(finance_path)
-        price_rows = read_csv(price_path)
+        finance = read_csv(finance_path, FINANCE_COLUMNS)
+        price = read_csv(price_path, PRICE_COLUMNS)
     except Exception as e:
         print(f"  Error reading {code}: {e}")
         return None
 
-    if not finance_rows or not price_rows:
+    if not finance['DiscDate'] or not price['Date']:
         return None
 
-    # 株価の日付→終値マッピングを構築
-    price_by_date = {}
-    for row in price_rows:
-        date_str = row.get('Date', '').strip()
-        close = to_float(row.get('Close'))
-        if date_str and close is not None:
-            price_by_date[date_str] = close
+    # 株価の日付→終値マッピングを構築（日付・終値の欠けた行は除く）
+    price_dates = map(str.strip, price['Date'])
+    price_closes = map(to_float, price['Close'])
+    price_by_date = {d: c for d, c in zip(price_dates, price_closes)
+                     if d and c is not None}
 
-    sorted_dates = sorted(price_by_date.keys())
+    # 日付順の (日付, 終値) を一度だけ作り、日付検索と月次株価の双方で使う
+    sorted_dates = sorted(price_by_date)
     if not sorted_dates:
         return None
+    price_pairs = [(d, price_by_date[d]) for d in sorted_dates]
 
     # 最新の株価
     latest_price = price_by_date[sorted_dates[-1]]
 
+    # 財務データの文字列列は空白を除去し、数値列は列ごとに一括で float に変換する
+    str_cols = {field: list(map(str.strip, finance[field]))
+                for field in FINANCE_STR_FIELDS}
+    num_cols = {field: list(map(to_float, finance[field]))
+                for field in FINANCE_NUM_FIELDS}
+    disc_dates = str_cols['DiscDate']
+
+    # 開示日当日または翌営業日の株価を、全開示日についてまとめて取得
+    # （最新指標・履歴の双方でこの結果を使い回す）
+    prices_at = [find_price_on_or_after_date(price_by_date, sorted_dates, d) if d else None
+                 for d in disc_dates]
+
     # 最新の財務データから全フィールドを取得
-    latest_finance = {}
-    # 文字列フィールド
-    for field in FINANCE_STR_FIELDS:
-        for row in reversed(finance_rows):
-            v = row.get(field, '').strip()
+    # 各フィールドを独立に最新の有効値から取得し、数値フィールドはその開示日
+    # （当日または翌営業日）の株価も記録する。
+    # 末尾の行から一度だけ遡り、全フィールドが埋まった時点で打ち切る。
+    latest_finance = dict.fromkeys(FINANCE_STR_FIELDS + FINANCE_NUM_FIELDS)
+    disc_prices = {}
+    pending_str = FINANCE_STR_FIELDS
+    pending_num = FINANCE_NUM_FIELDS
+    for i in range(len(disc_dates) - 1, -1, -1):
+        remaining = []
+        for field in pending_str:
+            v = str_cols[field][i]
             if v:
                 latest_finance[field] = v
-                break
-        if field not in latest_finance:
-            latest_finance[field] = None
-
-    # 数値フィールド（各フィールドを独立に最新の有効値から取得し、開示日も記録）
-    field_disc_dates = {}
-    for field in FINANCE_NUM_FIELDS:
-        for row in reversed(finance_rows):
-            v = to_float(row.get(field))
+            else:
+                remaining.append(field)
+        pending_str = remaining
+
+        remaining = []
+        for field in pending_num:
+            v = num_cols[field][i]
             if v is not None:
                 latest_finance[field] = v
-                disc_date = row.get('DiscDate', '').strip()
-                if disc_date:
-                    field_disc_dates[field] = disc_date
-                break
-        if field not in latest_finance:
-            latest_finance[field] = None
+                disc_prices[field] = prices_at[i]
+            else:
+                remaining.append(field)
+        pending_num = remaining
+
+        if not pending_str and not pending_num:
+            break
+
+    # 指標計算に使う最新値
+    eps = latest_finance['EPS']
+    bps = latest_finance['BPS']
+    np_val = latest_finance['NP']
+    cfo = latest_finance['CFO']
+    cfi = latest_finance['CFI']
+    cff = latest_finance['CFF']
+    ta = latest_finance['TA']
+    sales = latest_finance['Sales']
+    op_val = latest_finance['OP']
+    cash_eq = latest_finance['CashEq']
+    div_ann = latest_finance['DivAnn']
+    fdiv_ann = latest_finance['FDivAnn']
+    feps = latest_finance['FEPS']
 
     # キャッシュフロー合計（営業CF + 投資CF + 財務CF）
     cf_total = None
-    cfo_v = latest_finance.get('CFO')
-    cfi_v = latest_finance.get('CFI')
-    cff_v = latest_finance.get('CFF')
-    if cfo_v is not None and cfi_v is not None and cff_v is not None:
-        cf_total = cfo_v + cfi_v + cff_v
+    if cfo is not None and cfi is not None and cff is not None:
+        cf_total = cfo + cfi + cff
 
     # 指標を計算
-    # 株価を使う指標は、各数値の開示日当日または翌営業日の株価を使用する
-    def disc_price(field_name):
-        """フィールドの開示日に対応する株価を返す。"""
-        dd = field_disc_dates.get(field_name)
-        if dd:
-            return find_price_on_or_after_date(price_by_date, sorted_dates, dd)
-        return None
-
-    eps = latest_finance.get('EPS')
-    bps = latest_finance.get('BPS')
-    np_val = latest_finance.get('NP')
-    cfo = latest_finance.get('CFO')
+    # 株価を使う指標は、各数値の開示日当日または翌営業日の株価 (disc_prices) を使用する
 
     per = None
-    if eps and eps != 0:
-        p = disc_price('EPS')
+    if eps:
+        p = disc_prices.get('EPS')
         if p:
             per = round(p / eps, 2)
 
     pbr = None
-    if bps and bps != 0:
-        p = disc_price('BPS')
+    if bps:
+        p = disc_prices.get('BPS')
         if p:
             pbr = round(p / bps, 2)
 
     roe = None
-    if eps is not None and bps and bps != 0:
+    if eps is not None and bps:
         roe = round(eps / bps * 100, 2)
 
-    pcfr = None
-    if cfo and cfo != 0 and eps and eps != 0 and np_val and np_val != 0:
+    # 株式数（純利益 / EPS）。PCFR と時価総額で共用する
+    shares = None
+    if eps and np_val is not None:
         shares = abs(np_val / eps)
-        if shares > 0:
-            cfps = cfo / shares
-            if cfps != 0:
-                p = disc_price('CFO')
-                if p:
-                    pcfr = round(p / cfps, 2)
+        if not shares > 0:
+            shares = None
+
+    pcfr = None
+    if cfo and np_val and shares:
+        cfps = cfo / shares
+        if cfps != 0:
+            p = disc_prices.get('CFO')
+            if p:
+                pcfr = round(p / cfps, 2)
 
     # 配当利回り
     div_yield = None
-    div_ann = latest_finance.get('DivAnn')
     if div_ann:
-        p = disc_price('DivAnn')
-        if p and p != 0:
+        p = disc_prices.get('DivAnn')
+        if p:
             div_yield = round(div_ann / p * 100, 2)
 
     # 予想配当利回り
     fdiv_yield = None
-    fdiv_ann = latest_finance.get('FDivAnn')
     if fdiv_ann:
-        p = disc_price('FDivAnn')
-        if p and p != 0:
+        p = disc_prices.get('FDivAnn')
+        if p:
             fdiv_yield = round(fdiv_ann / p * 100, 2)
 
     # ROA
     roa = None
-    ta = latest_finance.get('TA')
-    if np_val is not None and ta and ta != 0:
+    if np_val is not None and ta:
         roa = round(np_val / ta * 100, 2)
 
     # 時価総額
     market_cap = None
-    if eps and eps != 0 and np_val is not None:
-        shares = abs(np_val / eps)
-        if shares > 0:
-            p = disc_price('EPS')
-            if p:
-                market_cap = round(p * shares)
+    if shares:
+        p = disc_prices.get('EPS')
+        if p:
+            market_cap = round(p * shares)
 
     # 予想PER (Forward PER)
     fper = None
-    feps = latest_finance.get('FEPS')
-    if feps and feps != 0:
-        p = disc_price('FEPS')
+    if feps:
+        p = disc_prices.get('FEPS')
         if p:
             fper = round(p / feps, 2)
 
     # PSR (株価売上高倍率)
-    sales = latest_finance.get('Sales')
     psr = None
-    if market_cap and sales and sales != 0:
+    if market_cap and sales:
         psr = round(market_cap / sales, 2)
 
     # EV/EBITDA
-    cash_eq = latest_finance.get('CashEq')
-    op_val = latest_finance.get('OP')
     ev_ebitda = None
-    if market_cap and op_val and op_val != 0:
+    if market_cap and op_val:
         ev = market_cap - (cash_eq or 0)
         if ev > 0:
             ev_ebitda = round(ev / op_val, 2)
@@ -278,103 +350,101 @@ def process_stock(code, finance_path, price_path, name):
 
     # 財務データの履歴（各開示日ごと）
     finance_history = []
-    for row in finance_rows:
-        date = row.get('DiscDate', '').strip()
+    for i, date in enumerate(disc_dates):
         if not date:
             continue
 
-        entry_np = to_float(row.get('NP'))
-        entry_eps = to_float(row.get('EPS'))
-        entry_bps = to_float(row.get('BPS'))
-        entry_cfo = to_float(row.get('CFO'))
-
-        # 開示日当日または翌営業日の株価を取得
-        price_at = find_price_on_or_after_date(price_by_date, sorted_dates, date)
+        entry_np = num_cols['NP'][i]
+        entry_eps = num_cols['EPS'][i]
+        entry_bps = num_cols['BPS'][i]
+        entry_cfo = num_cols['CFO'][i]
+        price_at = prices_at[i]
 
         # 各指標を計算
         entry_per = None
-        if price_at and entry_eps and entry_eps != 0:
+        if price_at and entry_eps:
             entry_per = round(price_at / entry_eps, 2)
 
         entry_pbr = None
-        if price_at and entry_bps and entry_bps != 0:
+        if price_at and entry_bps:
             entry_pbr = round(price_at / entry_bps, 2)
 
         entry_roe = None
-        if entry_eps is not None and entry_bps and entry_bps != 0:
+        if entry_eps is not None and entry_bps:
             entry_roe = round(entry_eps / entry_bps * 100, 2)
 
-        entry_pcfr = None
-        if (price_at and entry_cfo and entry_cfo != 0
-                and entry_eps and entry_eps != 0
-                and entry_np and entry_np != 0):
+        # 株式数（純利益 / EPS）。PCFR と時価総額で共用する
+        entry_shares = None
+        if entry_eps and entry_np:
             entry_shares = abs(entry_np / entry_eps)
-            if entry_shares > 0:
-                entry_cfps = entry_cfo / entry_shares
-                if entry_cfps != 0:
-                    entry_pcfr = round(price_at / entry_cfps, 2)
+            if not entry_shares > 0:
+                entry_shares = None
 
-        entry_sales = to_float(row.get('Sales'))
-        entry_op = to_float(row.get('OP'))
-        entry_odp = to_float(row.get('OdP'))
-        entry_cashEq = to_float(row.get('CashEq'))
-        entry_cur_fyen = row.get('CurFYEn', '').strip() or None
+        entry_pcfr = None
+        if price_at and entry_cfo and entry_shares:
+            entry_cfps = entry_cfo / entry_shares
+            if entry_cfps != 0:
+                entry_pcfr = round(price_at / entry_cfps, 2)
+
+        entry_sales = num_cols['Sales'][i]
+        entry_op = num_cols['OP'][i]
+        entry_odp = num_cols['OdP'][i]
+        entry_cashEq = num_cols['CashEq'][i]
+        entry_cur_fyen = str_cols['CurFYEn'][i] or None
 
         # 履歴用の時価総額
         entry_market_cap = None
-        if price_at and entry_eps and entry_eps != 0 and entry_np and entry_np != 0:
-            entry_shares = abs(entry_np / entry_eps)
-            if entry_shares > 0:
-                entry_market_cap = round(price_at * entry_shares)
+        if price_at and entry_shares:
+            entry_market_cap = round(price_at * entry_shares)
 
         # 追加の実績フィールド
-        entry_deps = to_float(row.get('DEPS'))
-        entry_ta = to_float(row.get('TA'))
-        entry_eq = to_float(row.get('Eq'))
-        entry_eqar = to_float(row.get('EqAR'))
-        entry_cfi = to_float(row.get('CFI'))
-        entry_cff = to_float(row.get('CFF'))
-        entry_div_ann = to_float(row.get('DivAnn'))
+        entry_deps = num_cols['DEPS'][i]
+        entry_ta = num_cols['TA'][i]
+        entry_eq = num_cols['Eq'][i]
+        entry_eqar = num_cols['EqAR'][i]
+        entry_cfi = num_cols['CFI'][i]
+        entry_cff = num_cols['CFF'][i]
+        entry_div_ann = num_cols['DivAnn'][i]
 
         # 追加の予想フィールド
-        entry_fdiv_ann = to_float(row.get('FDivAnn'))
-        entry_fpayout = to_float(row.get('FPayoutRatioAnn'))
-        entry_fsales = to_float(row.get('FSales'))
-        entry_fop = to_float(row.get('FOP'))
-        entry_fodp = to_float(row.get('FOdP'))
-        entry_fnp = to_float(row.get('FNP'))
-        entry_feps = to_float(row.get('FEPS'))
-        entry_nxfsales = to_float(row.get('NxFSales'))
-        entry_nxfop = to_float(row.get('NxFOP'))
-        entry_nxfodp = to_float(row.get('NxFOdP'))
-        entry_nxfnp = to_float(row.get('NxFNp'))
-        entry_nxfeps = to_float(row.get('NxFEPS'))
+        entry_fdiv_ann = num_cols['FDivAnn'][i]
+        entry_fpayout = num_cols['FPayoutRatioAnn'][i]
+        entry_fsales = num_cols['FSales'][i]
+        entry_fop = num_cols['FOP'][i]
+        entry_fodp = num_cols['FOdP'][i]
+        entry_fnp = num_cols['FNP'][i]
+        entry_feps = num_cols['FEPS'][i]
+        entry_nxfsales = num_cols['NxFSales'][i]
+        entry_nxfop = num_cols['NxFOP'][i]
+        entry_nxfodp = num_cols['NxFOdP'][i]
+        entry_nxfnp = num_cols['NxFNp'][i]
+        entry_nxfeps = num_cols['NxFEPS'][i]
 
         # 追加の計算指標
         entry_roa = None
-        if entry_np is not None and entry_ta and entry_ta != 0:
+        if entry_np is not None and entry_ta:
             entry_roa = round(entry_np / entry_ta * 100, 2)
 
         entry_div_yield = None
-        if entry_div_ann and price_at and price_at != 0:
+        if entry_div_ann and price_at:
             entry_div_yield = round(entry_div_ann / price_at * 100, 2)
 
         entry_fper = None
-        if entry_feps and entry_feps != 0 and price_at:
+        if entry_feps and price_at:
             entry_fper = round(price_at / entry_feps, 2)
 
         entry_psr = None
-        if entry_market_cap and entry_sales and entry_sales != 0:
+        if entry_market_cap and entry_sales:
             entry_psr = round(entry_market_cap / entry_sales, 2)
 
         entry_ev_ebitda = None
-        if entry_market_cap and entry_op and entry_op != 0:
+        if entry_market_cap and entry_op:
             entry_ev = entry_market_cap - (entry_cashEq or 0)
             if entry_ev > 0:
                 entry_ev_ebitda = round(entry_ev / entry_op, 2)
 
         entry_fdiv_yield = None
-        if entry_fdiv_ann and price_at and price_at != 0:
+        if entry_fdiv_ann and price_at:
             entry_fdiv_yield = round(entry_fdiv_ann / price_at * 100, 2)
 
         # キャッシュフロー合計
@@ -431,43 +501,105 @@ def process_stock(code, finance_path, price_path, name):
         ])
 
     # 月次株価データ（チャート用）
-    monthly_prices = get_quarterly_prices(price_rows)
-
-    result = {
-        'code': code,
-        'name': name,
-        'price': latest_price,
-    }
-
-    # 文字列フィールド
-    for field in FINANCE_STR_FIELDS:
-        result[field] = latest_finance.get(field)
-
-    # 数値フィールド
-    for field in FINANCE_NUM_FIELDS:
-        result[field] = latest_finance.get(field)
-
-    # 計算指標
-    result['per'] = per
-    result['pbr'] = pbr
-    result['roe'] = roe
-    result['pcfr'] = pcfr
-    result['DivYield'] = div_yield
-    result['FDivYield'] = fdiv_yield
-    result['roa'] = roa
-    result['MarketCap'] = market_cap
-    result['fper'] = fper
-    result['psr'] = psr
-    result['ev_ebitda'] = ev_ebitda
-    result['CFTotal'] = cf_total
-
-    # 履歴データ
-    result['ph'] = monthly_prices       # [[date, close], ...]
-    result['fh'] = finance_history      # [[date, profit, per, pbr, roe, pcfr], ...]
+    monthly_prices = get_quarterly_prices(price_pairs)
+
+    return (
+        code,
+        name,
+        latest_price,
+        *(latest_finance[field] for field in FINANCE_STR_FIELDS),
+        *(latest_finance[field] for field in FINANCE_NUM_FIELDS),
+        # 計算指標
+        per,
+        pbr,
+        roe,
+        pcfr,
+        div_yield,
+        fdiv_yield,
+        roa,
+        market_cap,
+        fper,
+        psr,
+        ev_ebitda,
+        cf_total,
+        # 履歴データ
+        monthly_prices,     # ph: [[date, close], ...]
+        finance_history,    # fh: [[date, profit, per, pbr, roe, pcfr], ...]
+    )
+
+
+def list_csv_files(directory):
+    """directory 内のCSVファイルを コード→パス のマッピングで返す。
+
+    ディレクトリの読み出しは os.listdir の1回だけで済ませる
+    （glob と同様に . で始まるファイルは除き、ディレクトリがなければ空とする）。
+    """
+    try:
+        filenames = os.listdir(directory)
+    except FileNotFoundError:
+        return {}
+    files = {}
+    for filename in filenames:
+        if filename.endswith('.csv') and not filename.startswith('.'):
+            files[filename[:-len('.csv')]] = os.path.join(directory, filename)
+    return files
+
+
+def process_stock_cached(code, finance_path, price_path, name):
+    """process_stock の結果を CACHE_DIR にキャッシュしつつ返す。
+
+    入力CSV 2つと本スクリプトの更新日時、銘柄名が前回と同じであれば
+    CSVを読み直さずにキャッシュ済みの結果を返す。処理できなかった銘柄
+    （結果が None）はキャッシュしない。
+    """
+    cache_path = os.path.join(CACHE_DIR, f'{code}.json')
+    try:
+        key = [os.path.getmtime(finance_path), os.path.getmtime(price_path),
+               os.path.getmtime(os.path.abspath(__file__)), name]
+    except OSError:
+        return process_stock(code, finance_path, price_path, name)
 
+    try:
+        cached = read_json(cache_path)
+        if isinstance(cached, dict) and cached.get('key') == key:
+            return cached.get('result')
+    except (OSError, ValueError):
+        pass
+
+    result = process_stock(code, finance_path, price_path, name)
+    if result is None:
+        # 読み込みエラーは入力の更新日時が変わらなくても解消し得るため、
+        # 処理できなかった銘柄はキャッシュせず毎回処理し直す
+        return None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        write_json({'key': key, 'result': result}, cache_path)
+    except OSError:
+        pass
     return result
 
 
+def _process_task(task):
+    """(code, finance_path, price_path, name) を受け取り銘柄を処理する。"""
+    return process_stock_cached(*task)
+
+
+def process_all(tasks):
+    """全銘柄を処理し、結果を tasks の順に1件ずつ返す。
+
+    銘柄ごとの処理は互いに独立なので、複数プロセスで並列に実行する
+    （出力順を保つため imap を使う）。
+    """
+    workers = os.cpu_count() or 1
+    if workers > 1:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        with multiprocessing.Pool(workers) as pool:
+            yield from pool.imap(_process_task, tasks, chunksize)
+    else:
+        for task in tasks:
+            yield _process_task(task)
+
+
 def main():
     print("日本株データを処理中...")
 
@@ -475,31 +607,36 @@ def main():
     chartlist = load_chartlist()
     print(f"  銘柄名マッピング: {len(chartlist)} 件")
 
-    # financedata内の全CSVファイルを取得
-    finance_files = sorted(glob.glob(os.path.join(FINANCE_DIR, '*.csv')))
+    # financedata と data の全CSVファイルを取得し、両方にある銘柄だけを処理する
+    finance_files = list_csv_files(FINANCE_DIR)
+    price_files = list_csv_files(DATA_DIR)
     print(f"  financedata: {len(finance_files)} ファイル")
 
-    stocks = []
-    skipped = 0
-
-    for fpath in finance_files:
-        code = os.path.splitext(os.path.basename(fpath))[0]
-        price_path = os.path.join(DATA_DIR, f'{code}.csv')
-
-        if not os.path.exists(price_path):
-            skipped += 1
-            continue
-
-        name = chartlist.get(code, code)
-        result = process_stock(code, fpath, price_path, name)
-        if result:
-            stocks.append(result)
-
-    print(f"  処理完了: {len(stocks)} 銘柄 (スキップ: {skipped})")
+    codes = sorted(finance_files.keys() & price_files.keys())
+    skipped = len(finance_files) - len(codes)
+    tasks = [(code, finance_files[code], price_files[code], chartlist.get(code, code))
+             for code in codes]
 
     # JSONを出力
-    with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(stocks, f, ensure_ascii=False, separators=(',', ':'))
+    # 全銘柄の結果のリストや出力全体の JSON 文字列は作らず、受け取った順に
+    # 1銘柄ずつ配列の要素として書き出す。
+    # 途中で失敗しても既存の出力を壊さないよう、一時ファイルに書いてから
+    # os.replace で置き換える。
+    count = 0
+    tmp_file = OUTPUT_FILE + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(b'[')
+        for result in process_all(tasks):
+            if not result:
+                continue
+            if count:
+                f.write(b',')
+            f.write(dumps_json(dict(zip(RESULT_KEYS, result))))
+            count += 1
+        f.write(b']')
+    os.replace(tmp_file, OUTPUT_FILE)
+
+    print(f"  処理完了: {count} 銘柄 (スキップ: {skipped})")
 
     file_size = os.path.getsize(OUTPUT_FILE) / (1024 * 1024)
     print(f"  出力: {OUTPUT_FILE} ({file_size:.1f} MB)")